@@ -1,39 +1,95 @@
 # course-service/data_service.py
+import hashlib
+import threading
+from pydantic import TypeAdapter
 from models import Course
 
+# Serializes a list of courses straight to JSON bytes in pydantic-core
+_course_list_adapter = TypeAdapter(list[Course])
+
 class CourseMockDataService:
     def __init__(self):
-        self.courses = [
+        initial_courses = [
             Course(id=1, name="Introduction to Computer Science", code="CS101", credits=3, instructor="Dr. Smith", description="Basic concepts of computer science"),
             Course(id=2, name="Data Structures and Algorithms", code="CS201", credits=4, instructor="Dr. Johnson", description="Advanced data structures and algorithm design"),
             Course(id=3, name="Database Systems", code="CS301", credits=3, instructor="Dr. Williams", description="Relational database design and SQL"),
         ]
+        # Courses indexed by id for O(1) lookup, update and delete
+        self.courses: dict[int, Course] = {c.id: c for c in initial_courses}
         self.next_id = 4
+        # (json_bytes, etag) for all courses and JSON bytes per course id, rebuilt lazily
+        # after writes. Writers bump _generation so a rebuild that raced with a write is not stored.
+        self._all_cache: tuple[bytes, str] | None = None
+        self._course_cache: dict[int, bytes] = {}
+        self._generation = 0
+        self._cache_lock = threading.Lock()
 
     def get_all_courses(self):
-        return self.courses
+        return list(self.courses.values())
+
+    def get_all_courses_json(self):
+        """Return (json_bytes, etag) for all courses, serializing only after a write"""
+        cached = self._all_cache
+        if cached is not None:
+            return cached
+
+        with self._cache_lock:
+            generation = self._generation
+        content = _course_list_adapter.dump_json(list(self.courses.values()))
+        cached = (content, f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"')
+        with self._cache_lock:
+            if self._generation == generation:
+                self._all_cache = cached
+        return cached
+
+    def get_course_json(self, course_id: int):
+        """Return JSON bytes for a course (None if missing), serializing only after a write"""
+        cached = self._course_cache.get(course_id)
+        if cached is not None:
+            return cached
+
+        with self._cache_lock:
+            generation = self._generation
+        course = self.courses.get(course_id)
+        if course is None:
+            return None
+        content = course.model_dump_json().encode()
+        with self._cache_lock:
+            if self._generation == generation:
+                self._course_cache[course_id] = content
+        return content
+
+    def _invalidate_cache(self):
+        with self._cache_lock:
+            self._generation += 1
+            self._all_cache = None
+            self._course_cache = {}
 
     def get_course_by_id(self, course_id: int):
-        return next((c for c in self.courses if c.id == course_id), None)
+        return self.courses.get(course_id)
 
     def add_course(self, course_data):
-        new_course = Course(id=self.next_id, **course_data.model_dump())
-        self.courses.append(new_course)
+        # course_data is already validated, so build the Course without revalidating it
+        new_course = Course.model_construct(
+            id=self.next_id,
+            **{field: getattr(course_data, field) for field in type(course_data).model_fields}
+        )
+        self.courses[new_course.id] = new_course
         self.next_id += 1
+        self._invalidate_cache()
         return new_course
 
     def update_course(self, course_id: int, course_data):
         course = self.get_course_by_id(course_id)
         if course:
-            update_data = course_data.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(course, key, value)
+            for key in course_data.model_fields_set:
+                setattr(course, key, getattr(course_data, key))
+            self._invalidate_cache()
             return course
         return None
 
     def delete_course(self, course_id: int):
-        course = self.get_course_by_id(course_id)
-        if course:
-            self.courses.remove(course)
-            return True
-        return False
+        if self.courses.pop(course_id, None) is None:
+            return False
+        self._invalidate_cache()
+        return True
@@ -1,8 +1,8 @@
 # course-service/main.py
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, Header, HTTPException, Response, status
 from models import Course, CourseCreate, CourseUpdate
 from service import CourseService
-from typing import List
+from typing import Optional
 
 app = FastAPI(title="Course Microservice", version="1.0.0")
 
@@ -14,19 +14,36 @@ def read_root():
     return {"message": "Course Microservice is running"}
 
 
-@app.get("/api/courses", response_model=List[Course])
-def get_all_courses():
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header ('*' or a comma-separated list of ETags) against an ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses weak comparison, so ignore a W/ prefix
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@app.get("/api/courses")
+def get_all_courses(if_none_match: Optional[str] = Header(None)):
     """Get all courses"""
-    return course_service.get_all()
+    # Serve pre-serialized JSON so Pydantic doesn't revalidate every course per request
+    content, etag = course_service.get_all_json()
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
 
 
 @app.get("/api/courses/{course_id}", response_model=Course)
 def get_course(course_id: int):
     """Get a course by ID"""
-    course = course_service.get_by_id(course_id)
-    if not course:
+    # Serve cached JSON, invalidated on every write like the course list
+    content = course_service.get_json_by_id(course_id)
+    if content is None:
         raise HTTPException(status_code=404, detail="Course not found")
-    return course
+    return Response(content=content, media_type="application/json")
 
 
 @app.post("/api/courses", response_model=Course, status_code=status.HTTP_201_CREATED)
@@ -51,3 +68,11 @@ def delete_course(course_id: int):
     if not success:
         raise HTTPException(status_code=404, detail="Course not found")
     return None
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Single worker: courses and their cached JSON live in process memory
+    # loop="auto" uses uvloop where it is installed (it is not available on Windows)
+    uvicorn.run(app, port=8002, loop="auto", http="httptools")
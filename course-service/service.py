@@ -8,9 +8,15 @@ class CourseService:
     def get_all(self):
         return self.data_service.get_all_courses()
 
+    def get_all_json(self):
+        return self.data_service.get_all_courses_json()
+
     def get_by_id(self, course_id: int):
         return self.data_service.get_course_by_id(course_id)
 
+    def get_json_by_id(self, course_id: int):
+        return self.data_service.get_course_json(course_id)
+
     def create(self, course_data):
         return self.data_service.add_course(course_data)
 
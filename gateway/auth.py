@@ -1,11 +1,16 @@
 # gateway/auth.py
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from datetime import timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+import bcrypt
+import hashlib
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,53 +18,66 @@ load_dotenv()
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
+_ALGORITHMS = [ALGORITHM]
+# Key object built once so python-jose doesn't re-parse SECRET_KEY on every sign/verify
+_JWT_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+# Let python-jose reject tokens missing these claims while decoding
+_DECODE_OPTIONS = {"require_exp": True, "require_sub": True}
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
-# Password hashing - use a lazy initialization to avoid bcrypt import issues
-_pwd_context = None
-_users_db_initialized = False
-
-def get_pwd_context():
-    """Get password context, initializing it lazily"""
-    global _pwd_context
-    if _pwd_context is None:
-        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    return _pwd_context
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# bcrypt cost factor - the bcrypt default of 12 is ~4x slower than 10
+_bcrypt_rounds = os.getenv("BCRYPT_ROUNDS", "10")
+if not _bcrypt_rounds.strip().isdigit() or not 4 <= int(_bcrypt_rounds) <= 31:
+    # Fail loudly: an invalid value must not fall through to the plain text fallback
+    raise ValueError(f"BCRYPT_ROUNDS must be an integer from 4 to 31, got {_bcrypt_rounds!r}")
+BCRYPT_ROUNDS = int(_bcrypt_rounds)
+
+# Authentication cache configuration
+AUTH_CACHE_MAXSIZE = 1024
+AUTH_CACHE_TTL_SECONDS = 30
+AUTH_NEGATIVE_CACHE_TTL_SECONDS = 5
+JWT_CACHE_MAXSIZE = 10000
+JWT_CACHE_TTL_SECONDS = 5
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
-# Users database - will be initialized lazily
-USERS_DB = {}
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash"""
+    try:
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        # Not a bcrypt hash (e.g. plain text fallback)
+        return False
 
-def _init_users_db():
-    """Initialize users database with hashed passwords (lazy initialization)"""
-    global _users_db_initialized, USERS_DB
-    if _users_db_initialized:
-        return
-    
+
+def get_password_hash(password: str) -> str:
+    """Hash a password"""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+
+def _compute_users_db() -> dict:
+    """Build the users database with hashed passwords"""
     try:
-        ctx = get_pwd_context()
-        # Compute hashes - this may trigger bcrypt initialization, but only on first auth
-        USERS_DB = {
+        return {
             "admin": {
                 "username": "admin",
-                "hashed_password": ctx.hash("admin123"),
+                "hashed_password": get_password_hash("admin123"),
                 "role": "admin"
             },
             "user": {
                 "username": "user",
-                "hashed_password": ctx.hash("user123"),
+                "hashed_password": get_password_hash("user123"),
                 "role": "user"
             }
         }
-        _users_db_initialized = True
     except Exception as e:
         # Fallback: use plain text comparison if bcrypt fails (NOT for production!)
         # This is a workaround for bcrypt initialization issues
         import warnings
         warnings.warn(f"Bcrypt initialization failed: {e}. Using plain text fallback (NOT SECURE!)")
-        USERS_DB = {
+        return {
             "admin": {
                 "username": "admin",
                 "hashed_password": "admin123",  # Plain text fallback
@@ -71,49 +89,91 @@ def _init_users_db():
                 "role": "user"
             }
         }
-        _users_db_initialized = True
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return get_pwd_context().verify(plain_password, hashed_password)
+# Users database - the demo users are static, so hash their passwords once at import
+USERS_DB: dict[str, dict] = _compute_users_db()
+_get_user = USERS_DB.get
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return get_pwd_context().hash(password)
+# Bounded LRU caches of recent authentication results, keyed by
+# (username, sha256(password)) so plain passwords are never kept in memory.
+# Entries map to (expires_at, value) using time.monotonic() timestamps.
+_auth_cache: "OrderedDict[tuple[str, bytes], tuple[float, dict]]" = OrderedDict()
+_auth_negative_cache: "OrderedDict[tuple[str, bytes], tuple[float, bool]]" = OrderedDict()
+_auth_cache_lock = threading.Lock()
 
+# Bounded LRU cache of decoded JWT payloads, keyed by a blake2b digest of the token
+_jwt_cache: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+_jwt_cache_lock = threading.Lock()
 
-def authenticate_user(username: str, password: str) -> Optional[dict]:
-    """Authenticate a user and return user info if valid"""
-    # Initialize users DB on first authentication attempt
-    if not _users_db_initialized:
-        _init_users_db()
-    
-    user = USERS_DB.get(username)
-    if not user:
+
+def _cache_get(cache: OrderedDict, key, now: float):
+    """Return a cached value if present and not expired (caller holds the lock)"""
+    entry = cache.get(key)
+    if entry is None:
         return None
-    
+    expires_at, value = entry
+    if expires_at <= now:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict, key, value, expires_at: float, maxsize: int) -> None:
+    """Insert a value, evicting the least recently used entry (caller holds the lock)"""
+    cache[key] = (expires_at, value)
+    cache.move_to_end(key)
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def _check_credentials(user: dict, password: str) -> bool:
+    """Check a password against a stored user record"""
     # Check if we're using plain text fallback
     if user["hashed_password"] == password:
         # Plain text fallback (bcrypt failed)
-        return {"username": user["username"], "role": user["role"]}
-    
+        return True
+
     # Normal bcrypt verification
-    if not verify_password(password, user["hashed_password"]):
+    return verify_password(password, user["hashed_password"])
+
+
+async def authenticate_user(username: str, password: str) -> Optional[dict]:
+    """Authenticate a user and return user info if valid"""
+    # Cache lookups stay on the event loop; only a cache miss pays for a thread handoff
+    key = (username, hashlib.sha256(password.encode()).digest())
+    now = time.monotonic()
+    with _auth_cache_lock:
+        cached = _cache_get(_auth_cache, key, now)
+        if cached is not None:
+            return dict(cached)
+        if _cache_get(_auth_negative_cache, key, now):
+            return None
+
+    user = _get_user(username)
+    # bcrypt verification is CPU-bound, so keep it off the event loop
+    if not user or not await run_in_threadpool(_check_credentials, user, password):
+        with _auth_cache_lock:
+            _cache_put(_auth_negative_cache, key, True,
+                       time.monotonic() + AUTH_NEGATIVE_CACHE_TTL_SECONDS, AUTH_CACHE_MAXSIZE)
         return None
-    return {"username": user["username"], "role": user["role"]}
+
+    user_info = {"username": user["username"], "role": user["role"]}
+    with _auth_cache_lock:
+        _cache_put(_auth_cache, key, user_info,
+                   time.monotonic() + AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAXSIZE)
+    return dict(user_info)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # exp is a plain Unix timestamp, which is what the JWT spec stores anyway
+    lifetime = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TOKEN_EXPIRE_SECONDS
+    to_encode["exp"] = int(time.time()) + lifetime
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
@@ -125,16 +185,27 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    token = credentials.credentials
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _jwt_cache_lock:
+        payload = _cache_get(_jwt_cache, key, time.monotonic())
+
+    if payload is None:
+        try:
+            payload = jwt.decode(token, _JWT_KEY, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS)
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = USERS_DB.get(username)
+
+        # Never keep a token cached past its own expiry
+        now = time.monotonic()
+        expires_at = now + JWT_CACHE_TTL_SECONDS
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, now + (exp - time.time()))
+        with _jwt_cache_lock:
+            _cache_put(_jwt_cache, key, payload, expires_at, JWT_CACHE_MAXSIZE)
+
+    user = _get_user(payload["sub"])
     if user is None:
         raise credentials_exception
     
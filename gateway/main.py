@@ -1,9 +1,11 @@
 # gateway/main.py
 from fastapi import FastAPI, HTTPException, Request, status, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+import anyio.to_thread
 from pydantic import BaseModel
 import httpx
+import orjson
 from typing import Any, Optional
 from auth import authenticate_user, create_access_token, get_current_active_user, ACCESS_TOKEN_EXPIRE_MINUTES
 from datetime import timedelta
@@ -12,7 +14,7 @@ import logging
 
 logger = logging.getLogger("gateway")
 
-app = FastAPI(title="API Gateway", version="1.0.0")
+app = FastAPI(title="API Gateway", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Add logging middleware
 app.add_middleware(LoggingMiddleware)
@@ -26,12 +28,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Maximum number of worker threads for blocking work (e.g. bcrypt password checks)
+THREADPOOL_SIZE = 64
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    """Allow more concurrent blocking calls than anyio's default of 40"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
 # Service URLs
 SERVICES = {
     "student": "http://localhost:8001",
     "course": "http://localhost:8002"
 }
 
+# HTTP methods the gateway will forward
+ALLOWED_METHODS = ("GET", "POST", "PUT", "DELETE")
+_ALLOWED_METHODS = frozenset(ALLOWED_METHODS)
+
+# Constant parts of forward_request error details; per-call fields are merged in only when raising
+_ERR_SERVICE_NOT_FOUND = {"error": "Service Not Found", "available_services": tuple(SERVICES)}
+_ERR_METHOD_NOT_ALLOWED = {"error": "Method Not Allowed", "allowed_methods": ALLOWED_METHODS}
+_ERR_GATEWAY_TIMEOUT = {"error": "Gateway Timeout", "timeout": "30 seconds"}
+_ERR_SERVICE_UNAVAILABLE = {"error": "Service Unavailable"}
+_ERR_BAD_GATEWAY = {"error": "Bad Gateway"}
+_ERR_INTERNAL = {
+    "error": "Internal Server Error",
+    "message": "An unexpected error occurred while processing your request"
+}
+
+# Shared HTTP client so upstream connections are pooled and kept alive across requests
+_http_client = httpx.AsyncClient(
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+)
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close pooled upstream connections"""
+    await _http_client.aclose()
+
 
 class LoginRequest(BaseModel):
     username: str
@@ -51,115 +90,102 @@ async def forward_request(service: str, path: str, method: str, **kwargs) -> Any
         logger.error(f"Service '{service}' not found in registry")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error": "Service Not Found",
-                "message": f"The requested service '{service}' is not available",
-                "available_services": list(SERVICES.keys())
-            }
+            detail={**_ERR_SERVICE_NOT_FOUND, "message": f"The requested service '{service}' is not available"}
+        )
+
+    if method not in _ALLOWED_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+            detail={**_ERR_METHOD_NOT_ALLOWED, "message": f"HTTP method '{method}' is not supported"}
         )
 
     url = f"{SERVICES[service]}{path}"
-    logger.info(f"Forwarding {method} request to {service} service: {url}")
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            if method == "GET":
-                response = await client.get(url, **kwargs)
-            elif method == "POST":
-                response = await client.post(url, **kwargs)
-            elif method == "PUT":
-                response = await client.put(url, **kwargs)
-            elif method == "DELETE":
-                response = await client.delete(url, **kwargs)
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-                    detail={
-                        "error": "Method Not Allowed",
-                        "message": f"HTTP method '{method}' is not supported",
-                        "allowed_methods": ["GET", "POST", "PUT", "DELETE"]
-                    }
-                )
+    logger.info("Forwarding %s request to %s service: %s", method, service, url)
+
+    try:
+        response = await _http_client.request(method, url, **kwargs)
+
+        # Handle different response status codes
+        if response.status_code >= 400:
+            error_detail = None
+            try:
+                error_detail = orjson.loads(response.content)
+            except:
+                error_detail = {"detail": response.text or "Unknown error"}
             
-            # Handle different response status codes
-            if response.status_code >= 400:
-                error_detail = None
-                try:
-                    error_detail = response.json()
-                except:
-                    error_detail = {"detail": response.text or "Unknown error"}
-                
-                logger.warning(f"Service {service} returned error: {response.status_code} - {error_detail}")
-                
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail={
-                        "error": f"Service Error ({response.status_code})",
-                        "message": error_detail.get("detail", "An error occurred in the microservice"),
-                        "service": service,
-                        "path": path
-                    }
-                )
+            logger.warning(f"Service {service} returned error: {response.status_code} - {error_detail}")
             
-            # Return successful response
-            response_data = None
-            if response.text:
-                try:
-                    response_data = response.json()
-                except:
-                    response_data = {"raw": response.text}
-            
-            return JSONResponse(
-                content=response_data,
-                status_code=response.status_code
-            )
-            
-        except httpx.TimeoutException as e:
-            logger.error(f"Timeout connecting to {service} service: {str(e)}")
             raise HTTPException(
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                status_code=response.status_code,
                 detail={
-                    "error": "Gateway Timeout",
-                    "message": f"The {service} service did not respond in time",
+                    "error": f"Service Error ({response.status_code})",
+                    "message": error_detail.get("detail", "An error occurred in the microservice"),
                     "service": service,
-                    "timeout": "30 seconds"
-                }
-            )
-        except httpx.ConnectError as e:
-            logger.error(f"Connection error to {service} service: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail={
-                    "error": "Service Unavailable",
-                    "message": f"Unable to connect to {service} service. Please check if the service is running.",
-                    "service": service,
-                    "url": url
-                }
-            )
-        except httpx.RequestError as e:
-            logger.error(f"Request error to {service} service: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail={
-                    "error": "Bad Gateway",
-                    "message": f"Error communicating with {service} service",
-                    "service": service,
-                    "error_details": str(e)
-                }
-            )
-        except HTTPException:
-            # Re-raise HTTP exceptions as-is
-            raise
-        except Exception as e:
-            logger.error(f"Unexpected error forwarding request to {service}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail={
-                    "error": "Internal Server Error",
-                    "message": "An unexpected error occurred while processing your request",
-                    "service": service
+                    "path": path
                 }
             )
+        
+        # Return successful response (including 304) - pass the upstream body through without re-encoding it
+        etag = response.headers.get("etag")
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            headers={"ETag": etag} if etag else None,
+            media_type=response.headers.get("content-type")
+        )
+        
+    except httpx.TimeoutException as e:
+        logger.error(f"Timeout connecting to {service} service: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                **_ERR_GATEWAY_TIMEOUT,
+                "message": f"The {service} service did not respond in time",
+                "service": service
+            }
+        )
+    except httpx.ConnectError as e:
+        logger.error(f"Connection error to {service} service: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                **_ERR_SERVICE_UNAVAILABLE,
+                "message": f"Unable to connect to {service} service. Please check if the service is running.",
+                "service": service,
+                "url": url
+            }
+        )
+    except httpx.RequestError as e:
+        logger.error(f"Request error to {service} service: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail={
+                **_ERR_BAD_GATEWAY,
+                "message": f"Error communicating with {service} service",
+                "service": service,
+                "error_details": str(e)
+            }
+        )
+    except HTTPException:
+        # Re-raise HTTP exceptions as-is
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error forwarding request to {service}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={**_ERR_INTERNAL, "service": service}
+        )
+
+
+def _conditional_headers(request: Request) -> Optional[dict]:
+    """Client conditional GET headers to forward upstream"""
+    if_none_match = request.headers.get("if-none-match")
+    return {"if-none-match": if_none_match} if if_none_match else None
+
+
+def _body_headers(request: Request) -> dict:
+    """Headers needed to forward a raw request body upstream"""
+    return {"content-type": request.headers.get("content-type", "application/json")}
 
 
 @app.get("/")
@@ -175,7 +201,7 @@ def read_root():
 @app.post("/gateway/auth/login", status_code=status.HTTP_200_OK)
 async def login(login_data: LoginRequest):
     """Authenticate user and return JWT token"""
-    user = authenticate_user(login_data.username, login_data.password)
+    user = await authenticate_user(login_data.username, login_data.password)
     if not user:
         logger.warning(f"Failed login attempt for username: {login_data.username}")
         raise HTTPException(
@@ -216,29 +242,29 @@ async def get_current_user_info(current_user: dict = Depends(get_current_active_
 
 # Student Service Routes (Protected)
 @app.get("/gateway/students")
-async def get_all_students(current_user: dict = Depends(get_current_active_user)):
+async def get_all_students(request: Request, current_user: dict = Depends(get_current_active_user)):
     """Get all students through gateway"""
-    return await forward_request("student", "/api/students", "GET")
+    return await forward_request("student", "/api/students", "GET", headers=_conditional_headers(request))
 
 
 @app.get("/gateway/students/{student_id}")
-async def get_student(student_id: int, current_user: dict = Depends(get_current_active_user)):
+async def get_student(student_id: int, request: Request, current_user: dict = Depends(get_current_active_user)):
     """Get a student by ID through gateway"""
-    return await forward_request("student", f"/api/students/{student_id}", "GET")
+    return await forward_request("student", f"/api/students/{student_id}", "GET", headers=_conditional_headers(request))
 
 
 @app.post("/gateway/students")
 async def create_student(request: Request, current_user: dict = Depends(get_current_active_user)):
     """Create a new student through gateway"""
-    body = await request.json()
-    return await forward_request("student", "/api/students", "POST", json=body)
+    body = await request.body()
+    return await forward_request("student", "/api/students", "POST", content=body, headers=_body_headers(request))
 
 
 @app.put("/gateway/students/{student_id}")
 async def update_student(student_id: int, request: Request, current_user: dict = Depends(get_current_active_user)):
     """Update a student through gateway"""
-    body = await request.json()
-    return await forward_request("student", f"/api/students/{student_id}", "PUT", json=body)
+    body = await request.body()
+    return await forward_request("student", f"/api/students/{student_id}", "PUT", content=body, headers=_body_headers(request))
 
 
 @app.delete("/gateway/students/{student_id}")
@@ -249,29 +275,29 @@ async def delete_student(student_id: int, current_user: dict = Depends(get_curre
 
 # Course Service Routes (Protected)
 @app.get("/gateway/courses")
-async def get_all_courses(current_user: dict = Depends(get_current_active_user)):
+async def get_all_courses(request: Request, current_user: dict = Depends(get_current_active_user)):
     """Get all courses through gateway"""
-    return await forward_request("course", "/api/courses", "GET")
+    return await forward_request("course", "/api/courses", "GET", headers=_conditional_headers(request))
 
 
 @app.get("/gateway/courses/{course_id}")
-async def get_course(course_id: int, current_user: dict = Depends(get_current_active_user)):
+async def get_course(course_id: int, request: Request, current_user: dict = Depends(get_current_active_user)):
     """Get a course by ID through gateway"""
-    return await forward_request("course", f"/api/courses/{course_id}", "GET")
+    return await forward_request("course", f"/api/courses/{course_id}", "GET", headers=_conditional_headers(request))
 
 
 @app.post("/gateway/courses")
 async def create_course(request: Request, current_user: dict = Depends(get_current_active_user)):
     """Create a new course through gateway"""
-    body = await request.json()
-    return await forward_request("course", "/api/courses", "POST", json=body)
+    body = await request.body()
+    return await forward_request("course", "/api/courses", "POST", content=body, headers=_body_headers(request))
 
 
 @app.put("/gateway/courses/{course_id}")
 async def update_course(course_id: int, request: Request, current_user: dict = Depends(get_current_active_user)):
     """Update a course through gateway"""
-    body = await request.json()
-    return await forward_request("course", f"/api/courses/{course_id}", "PUT", json=body)
+    body = await request.body()
+    return await forward_request("course", f"/api/courses/{course_id}", "PUT", content=body, headers=_body_headers(request))
 
 
 @app.delete("/gateway/courses/{course_id}")
@@ -285,7 +311,7 @@ async def delete_course(course_id: int, current_user: dict = Depends(get_current
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Enhanced HTTP exception handler"""
     logger.error(f"HTTP Exception: {exc.status_code} - {exc.detail}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail.get("error", "Error") if isinstance(exc.detail, dict) else "Error",
@@ -300,7 +326,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 async def general_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unexpected errors"""
     logger.exception(f"Unhandled exception: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal Server Error",
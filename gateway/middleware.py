@@ -1,10 +1,7 @@
 # gateway/middleware.py
 import time
 import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-import json
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Configure logging
 logging.basicConfig(
@@ -14,40 +11,58 @@ logging.basicConfig(
 logger = logging.getLogger("gateway")
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all incoming requests and responses"""
-    
-    async def dispatch(self, request: Request, call_next):
+class LoggingMiddleware:
+    """Middleware to log all incoming requests and responses
+
+    Implemented as plain ASGI rather than BaseHTTPMiddleware, which adds a
+    task and memory stream per request and buffers streaming responses.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Log request
-        start_time = time.time()
-        
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+
         # Log request details (without reading body to avoid consuming the stream)
-        logger.info(
-            f"Request: {request.method} {request.url.path} | "
-            f"Client: {request.client.host if request.client else 'unknown'} | "
-            f"Query params: {dict(request.query_params)}"
-        )
-        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Request: %s %s | Client: %s | Query params: %s",
+                method, path, client[0] if client else "unknown", scope["query_string"].decode("latin-1")
+            )
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         # Process request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Log exception
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             logger.error(
-                f"Exception: {request.method} {request.url.path} | "
-                f"Error: {str(e)} | "
-                f"Process time: {process_time:.3f}s"
+                "Exception: %s %s | Error: %s | Process time: %.3fs",
+                method, path, e, process_time
             )
             raise
-        
+
         # Log response
-        process_time = time.time() - start_time
-        
+        process_time = time.perf_counter() - start_time
+
         logger.info(
-            f"Response: {request.method} {request.url.path} | "
-            f"Status: {response.status_code} | "
-            f"Process time: {process_time:.3f}s"
+            "Response: %s %s | Status: %s | Process time: %.3fs",
+            method, path, status_code, process_time
         )
-        
-        return response
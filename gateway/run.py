@@ -0,0 +1,11 @@
+# gateway/run.py
+import os
+import uvicorn
+
+# Launcher kept separate from main.py so the worker supervisor process doesn't
+# run the app's module-level setup (password hashing, the shared HTTP client)
+
+if __name__ == "__main__":
+    # loop="auto" uses uvloop where it is installed (it is not available on Windows);
+    # the gateway keeps no shared state, so it can run one worker per CPU
+    uvicorn.run("main:app", port=8000, loop="auto", http="httptools", workers=os.cpu_count())